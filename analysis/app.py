@@ -1,9 +1,16 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-from io import BytesIO
 from datetime import datetime
 
+from performance import drawdown_summary, equity_curve, rolling_ratios, trade_stats
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.export import MIME_TYPES, export_bytes
+
 st.set_page_config(page_title=" Trade Analyzer Monthly", layout="wide")
 st.title("📊 Advanced Options Data Analyzer")
 
@@ -90,12 +97,66 @@ if uploaded_file:
     st.subheader("📐 Win Rate by Strike")
     st.dataframe(calculate_win_rate(df_filtered, 'Strike'))
 
+    # Equity curve, drawdown and risk metrics
+    st.subheader("📉 Equity Curve & Drawdown")
+    curve = equity_curve(df_filtered)
+    fig4 = px.line(curve, x='Date', y=['Equity', 'Peak'], title='Equity Curve')
+    st.plotly_chart(fig4)
+    fig5 = px.area(curve, x='Date', y='Drawdown', title='Drawdown')
+    st.plotly_chart(fig5)
+    st.dataframe(drawdown_summary(curve))
+
+    st.subheader("📊 Rolling Sharpe / Sortino")
+    # Trading days with a closed trade in the filtered range; the window can't be longer
+    pnl_days = df_filtered.dropna(subset=['Profit/Loss'])['Date'].dt.normalize().nunique()
+    if pnl_days < 3:
+        st.info(f"Rolling ratios need at least 3 trading days with closed trades; the filtered range has {pnl_days}.")
+    else:
+        # 20 days by default, but short enough to leave several points in a short journal
+        ratio_window = st.slider("Rolling window (trading days)", min_value=2, max_value=pnl_days,
+                                 value=min(20, max(2, pnl_days // 2)))
+        split_options = {'Account': None, 'Instrument': 'Instrument', 'CE/PE': 'CE/PE',
+                         'Instrument + CE/PE': ['Instrument', 'CE/PE']}
+        split = st.selectbox("Split by", list(split_options))
+        ratio_by = split_options[split]
+        ratios = rolling_ratios(df_filtered, by=ratio_by, window=ratio_window)
+
+        if ratio_by is None:
+            fig6 = px.line(ratios, x='Date', y=['Rolling_Sharpe', 'Rolling_Sortino'],
+                           title=f'Rolling Risk-Adjusted Return ({ratio_window} Trading Days)')
+            st.plotly_chart(fig6)
+        else:
+            keys = [ratio_by] if isinstance(ratio_by, str) else ratio_by
+            ratios['Group'] = ratios[keys].astype(str).agg(' '.join, axis=1)
+            for metric in ['Rolling_Sharpe', 'Rolling_Sortino']:
+                fig = px.line(ratios, x='Date', y=metric, color='Group',
+                              title=f'{metric.replace("_", " ")} by {split} ({ratio_window} Trading Days)')
+                st.plotly_chart(fig)
+            # Groups that traded on fewer days than the window have no ratio at all
+            short = ratios.groupby('Group')['Rolling_Sharpe'].count()
+            short = short[short == 0].index.tolist()
+            if short:
+                st.caption(f"No {ratio_window}-day ratio yet for: {', '.join(short)}")
+
+    st.subheader("⚖️ Profit Factor & Expectancy by Instrument and CE/PE")
+    risk_by = ['Instrument', 'CE/PE']
+    risk_table = trade_stats(df_filtered, risk_by).join(
+        drawdown_summary(equity_curve(df_filtered, risk_by), risk_by))
+    st.dataframe(risk_table.reset_index())
+
     # Download filtered data
     st.subheader("⬇️ Download Filtered Data")
-    buffer = BytesIO()
-    df_filtered.to_csv(buffer, index=False)
-    st.download_button("Download Filtered Data as CSV", data=buffer.getvalue(),
-                       file_name="filtered_trades.csv", mime="text/csv")
+    export_fmt = st.selectbox("Format", ['csv', 'parquet', 'xlsx'])
+    # Built only on request and kept for the current file, filters and format,
+    # so other widget changes don't re-export the whole frame
+    export_key = (uploaded_file.name, uploaded_file.size, str(start_date), str(end_date),
+                  tuple(instruments), tuple(types), export_fmt)
+    if st.button("Prepare Download"):
+        st.session_state['export'] = (export_key, export_bytes(df_filtered, [export_fmt])[export_fmt])
+    prepared = st.session_state.get('export')
+    if prepared is not None and prepared[0] == export_key:
+        st.download_button(f"Download Filtered Data as {export_fmt.upper()}", data=prepared[1],
+                           file_name=f"filtered_trades.{export_fmt}", mime=MIME_TYPES[export_fmt])
 
     st.subheader("📄 Data Preview")
     st.dataframe(df_filtered)
@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+PNL = 'Profit/Loss'
+TRADING_DAYS = 252
+
+# Per-group totals that can simply be added when new trades arrive
+ADDITIVE_STATS = ['Trades', 'Wins', 'Losses', 'Gross_Profit', 'Gross_Loss', 'Net']
+
+def _keys(by):
+    # by=None means the whole account
+    if by is None:
+        return ['Account']
+    return [by] if isinstance(by, str) else list(by)
+
+def _closed_trades(df, by):
+    # Trades with a realized P&L, in time order
+    trades = df.dropna(subset=[PNL]).sort_values('Date', kind='stable')
+    if by is None:
+        trades = trades.assign(Account='All')
+    return trades, _keys(by)
+
+def equity_curve(df, by=None, start=None):
+    """Per-trade equity, running peak, drawdown, max drawdown and drawdown duration.
+
+    Pass the previous curve's last rows as ``start`` (see ``curve_state``) to
+    extend it with newly appended trades without replaying the history.
+    """
+    trades, keys = _closed_trades(df, by)
+    curve = trades[keys + ['Date', PNL]].reset_index(drop=True)
+    if start is not None:
+        carried = start.set_index(keys)[['Equity', 'Peak', 'Peak_Date', 'Max_Drawdown']]
+        curve = curve.join(carried.add_prefix('Prev_'), on=keys)
+    else:
+        curve[['Prev_Equity', 'Prev_Peak', 'Prev_Max_Drawdown']] = np.nan
+        curve['Prev_Peak_Date'] = pd.NaT
+
+    grouped = curve.groupby(keys, sort=False)
+    curve['Equity'] = grouped[PNL].cumsum() + curve['Prev_Equity'].fillna(0)
+    # Peak starts at zero (or the carried peak), so a losing first trade is a drawdown
+    curve['Peak'] = np.fmax(curve.groupby(keys, sort=False)['Equity'].cummax().clip(lower=0), curve['Prev_Peak'])
+    curve['Drawdown'] = curve['Equity'] - curve['Peak']
+    curve['Max_Drawdown'] = np.fmin(curve.groupby(keys, sort=False)['Drawdown'].cummin(), curve['Prev_Max_Drawdown'])
+
+    # Date of the last peak: forward-fill within each group from rows sitting at a peak
+    curve['Peak_Date'] = curve['Date'].where(curve['Drawdown'] >= 0)
+    curve['Peak_Date'] = curve.groupby(keys, sort=False)['Peak_Date'].ffill()
+    curve['Peak_Date'] = (curve['Peak_Date']
+                          .fillna(curve['Prev_Peak_Date'])
+                          .fillna(curve.groupby(keys, sort=False)['Date'].transform('first')))
+    curve['Drawdown_Days'] = (curve['Date'] - curve['Peak_Date']).dt.days
+
+    return curve.drop(columns=['Prev_Equity', 'Prev_Peak', 'Prev_Peak_Date', 'Prev_Max_Drawdown'])
+
+def curve_state(curve, by=None):
+    # Last row per group: everything equity_curve needs to carry on
+    return curve.groupby(_keys(by), sort=False).tail(1)
+
+def _finish_stats(stats):
+    stats['Win_Rate'] = stats['Wins'] / stats['Trades'] * 100
+    stats['Avg_Win'] = stats['Gross_Profit'] / stats['Wins'].replace(0, np.nan)
+    stats['Avg_Loss'] = stats['Gross_Loss'] / stats['Losses'].replace(0, np.nan)
+    stats['Profit_Factor'] = stats['Gross_Profit'] / stats['Gross_Loss'].replace(0, np.nan)
+    stats['Expectancy'] = stats['Net'] / stats['Trades']
+    return stats
+
+def trade_stats(df, by=None):
+    """Win rate, profit factor and expectancy (average P&L per trade) per group."""
+    trades, keys = _closed_trades(df, by)
+    pnl = trades[PNL]
+    stats = trades.assign(
+        Wins=pnl > 0,
+        Losses=pnl < 0,
+        Gross_Profit=pnl.clip(lower=0),
+        Gross_Loss=-pnl.clip(upper=0),
+    ).groupby(keys).agg(
+        Trades=(PNL, 'size'),
+        Wins=('Wins', 'sum'),
+        Losses=('Losses', 'sum'),
+        Gross_Profit=('Gross_Profit', 'sum'),
+        Gross_Loss=('Gross_Loss', 'sum'),
+        Net=(PNL, 'sum'),
+    )
+    return _finish_stats(stats)
+
+def update_trade_stats(stats, new_trades, by=None):
+    # Add the new trades' totals to the existing ones and re-derive the ratios
+    combined = stats[ADDITIVE_STATS].add(trade_stats(new_trades, by)[ADDITIVE_STATS], fill_value=0)
+    return _finish_stats(combined)
+
+def rolling_ratios(df, by=None, window=20):
+    """Daily P&L with rolling annualized Sharpe and Sortino over ``window`` trading days."""
+    trades, keys = _closed_trades(df, by)
+    daily = trades.groupby(keys + [trades['Date'].dt.normalize()])[PNL].sum()
+
+    def roll(series, stat):
+        rolled = getattr(series.groupby(level=keys, sort=False).rolling(window, min_periods=window), stat)()
+        return rolled.droplevel(list(range(len(keys))))
+
+    mean = roll(daily, 'mean')
+    std = roll(daily, 'std')
+    downside = np.sqrt(roll(daily.clip(upper=0) ** 2, 'mean'))
+    scale = np.sqrt(TRADING_DAYS)
+    return pd.DataFrame({
+        'Daily_PnL': daily,
+        'Rolling_Sharpe': mean / std.replace(0, np.nan) * scale,
+        'Rolling_Sortino': mean / downside.replace(0, np.nan) * scale,
+    }).reset_index()
+
+def drawdown_summary(curve, by=None):
+    return curve.groupby(_keys(by)).agg(
+        Final_Equity=('Equity', 'last'),
+        Max_Drawdown=('Max_Drawdown', 'last'),
+        Longest_Drawdown_Days=('Drawdown_Days', 'max'),
+    )
@@ -0,0 +1,197 @@
+import os
+import tempfile
+
+import pandas as pd
+
+# Rows per slice when exporting a single DataFrame
+DEFAULT_CHUNKSIZE = 50_000
+
+# Excel's hard row limit per sheet (header included)
+XLSX_MAX_ROWS = 1_048_576
+
+MIME_TYPES = {
+    'csv': 'text/csv',
+    'parquet': 'application/octet-stream',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+def iter_frames(data, chunksize=DEFAULT_CHUNKSIZE):
+    # A DataFrame is sliced into views; any other iterable of frames passes through
+    if isinstance(data, pd.DataFrame):
+        for start in range(0, max(len(data), 1), chunksize):
+            yield data.iloc[start:start + chunksize]
+    else:
+        yield from data
+
+class CsvWriter:
+    def __init__(self, sink):
+        self._own = isinstance(sink, str)
+        self._file = open(sink, 'wb') if self._own else sink
+        self._header = True
+
+    def write(self, chunk):
+        chunk.to_csv(self._file, index=False, header=self._header, encoding='utf-8')
+        self._header = False
+
+    def close(self):
+        if self._own:
+            self._file.close()
+
+class ParquetWriter:
+    """Parquet with one schema for the whole file, taken from the first chunk.
+
+    Object columns are written as strings: they may mix numbers and text
+    (an 'OPEN' in a price column) or be all-empty in the first chunk, and
+    neither has a single Arrow type otherwise. Numeric dtypes must not change
+    between chunks; CSV sources can get stable dtypes from csv_dtypes().
+    """
+
+    def __init__(self, sink):
+        self._sink = sink
+        self._writer = None
+
+    def _normalize(self, chunk):
+        import pyarrow as pa
+
+        text = [col for col, dtype in chunk.dtypes.items() if dtype == object]
+        if self._writer is not None:
+            # Keep columns that were text in the first chunk as text
+            text += [field.name for field in self._schema
+                     if field.name in chunk.columns and field.name not in text
+                     and (pa.types.is_string(field.type) or pa.types.is_large_string(field.type))]
+        if not text:
+            return chunk
+        return chunk.astype({col: 'string' for col in text})
+
+    def write(self, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        chunk = self._normalize(chunk)
+        if self._writer is None:
+            self._schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            self._writer = pq.ParquetWriter(self._sink, self._schema)
+        self._writer.write_table(pa.Table.from_pandas(chunk, schema=self._schema, preserve_index=False))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+class XlsxWriter:
+    # xlsxwriter in constant_memory mode flushes each row to disk once written
+    def __init__(self, sink, sheet_name='Data'):
+        import xlsxwriter
+
+        self._workbook = xlsxwriter.Workbook(sink, {
+            'constant_memory': True,
+            'default_date_format': 'yyyy-mm-dd hh:mm:ss',
+            'nan_inf_to_errors': True,
+            'remove_timezone': True,
+        })
+        self._sheet_name = sheet_name
+        self._sheets = 0
+        self._row = XLSX_MAX_ROWS
+
+    def _new_sheet(self, columns):
+        self._sheets += 1
+        name = self._sheet_name if self._sheets == 1 else f'{self._sheet_name}{self._sheets}'
+        self._sheet = self._workbook.add_worksheet(name)
+        self._sheet.write_row(0, 0, [str(col) for col in columns])
+        self._row = 1
+
+    def write(self, chunk):
+        # Blank cells for missing values, python datetimes for timestamps
+        values = chunk.astype(object).where(chunk.notna(), None)
+        for col in [col for col, dtype in chunk.dtypes.items() if pd.api.types.is_datetime64_any_dtype(dtype)]:
+            # An object Series, or pandas re-infers datetime64 and the None become NaT again
+            values[col] = pd.Series([None if pd.isna(ts) else ts.to_pydatetime() for ts in values[col]],
+                                    index=values.index, dtype=object)
+        for row in values.itertuples(index=False, name=None):
+            if self._row >= XLSX_MAX_ROWS:
+                self._new_sheet(chunk.columns)
+            self._sheet.write_row(self._row, 0, row)
+            self._row += 1
+
+    def close(self):
+        if self._sheets == 0:
+            self._workbook.add_worksheet(self._sheet_name)
+        self._workbook.close()
+
+WRITERS = {'csv': CsvWriter, 'parquet': ParquetWriter, 'xlsx': XlsxWriter}
+
+def write_frames(frames, writers):
+    """Stream frames into one or more writers; returns the number of rows written."""
+    rows = 0
+    try:
+        for chunk in frames:
+            for writer in writers:
+                writer.write(chunk)
+            rows += len(chunk)
+    finally:
+        for writer in writers:
+            writer.close()
+    return rows
+
+def export(data, sink, fmt=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Write a DataFrame or iterable of frames to a path or binary file as csv/parquet/xlsx.
+
+    Memory stays bounded by one chunk (plus the writer's row buffer).
+    """
+    if fmt is None:
+        fmt = os.path.splitext(sink)[1].lstrip('.').lower()
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported export format: {fmt!r} (expected one of {list(WRITERS)})")
+    return write_frames(iter_frames(data, chunksize), [WRITERS[fmt](sink)])
+
+def export_bytes(data, fmts, chunksize=DEFAULT_CHUNKSIZE):
+    """Export to each format in one pass and return {fmt: bytes} for st.download_button.
+
+    The writers stream through temporary files, which are removed before
+    returning. Streamlit needs the finished file as bytes, so the output
+    itself is held in memory once; only the buffering while writing is
+    bounded.
+    """
+    paths = {}
+    for fmt in fmts:
+        with tempfile.NamedTemporaryFile(suffix=f'.{fmt}', delete=False) as tmp:
+            paths[fmt] = tmp.name
+    try:
+        write_frames(iter_frames(data, chunksize), [WRITERS[fmt](path) for fmt, path in paths.items()])
+        outputs = {}
+        for fmt, path in paths.items():
+            with open(path, 'rb') as f:
+                outputs[fmt] = f.read()
+        return outputs
+    finally:
+        for path in paths.values():
+            os.unlink(path)
+
+def csv_dtypes(path, chunksize=DEFAULT_CHUNKSIZE):
+    """Column dtypes that fit every chunk of a CSV, from one extra read.
+
+    pandas infers dtypes per chunk, so a column can be int64 in one chunk and
+    float64 or text in the next, which a single Parquet schema can't hold.
+    """
+    kinds = {}
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        for col, dtype in chunk.dtypes.items():
+            kinds.setdefault(col, set()).add(dtype.kind)
+    dtypes = {}
+    for col, seen in kinds.items():
+        if seen <= {'i', 'u'}:
+            dtypes[col] = 'int64'
+        elif seen <= {'i', 'u', 'f'}:
+            dtypes[col] = 'float64'
+        elif seen == {'b'}:
+            dtypes[col] = 'bool'
+        else:
+            dtypes[col] = str
+    return dtypes
+
+if __name__ == '__main__':
+    # Batch use: python -m common.export input.csv output.{csv,parquet,xlsx}
+    import sys
+
+    src, out = sys.argv[1], sys.argv[2]
+    n = export(pd.read_csv(src, dtype=csv_dtypes(src), chunksize=DEFAULT_CHUNKSIZE), out)
+    print(f'Wrote {n} rows to {out}')
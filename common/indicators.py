@@ -0,0 +1,93 @@
+"""Indicator kernels over a (symbols x bars) float array.
+
+Each row is one symbol's history, oldest bar first. Histories of different
+lengths are NaN-padded at the start or end of the row; padded bars stay NaN
+in every output and the averages start at each row's first real bar, so a
+row matches the `ta` library run on that symbol's unpadded series (RSI, SMA,
+EMA, MACD with fillna=False).
+
+Bars must be contiguous within a row: don't align symbols on a shared
+calendar, which leaves NaN gaps inside rows. Stack each symbol's own bars
+instead, as backtest.stack_histories does.
+"""
+import numpy as np
+import pandas as pd
+
+def _ewm(values, alpha, min_periods):
+    # Recursive mean (pandas ewm adjust=False), stepping over bars and
+    # vectorized across symbols
+    values_t = np.ascontiguousarray(values.T)
+    out = np.full_like(values_t, np.nan)
+    state = np.full(values_t.shape[1], np.nan)
+    count = np.zeros(values_t.shape[1], dtype=np.int64)
+    decay = 1 - alpha
+    for t, x in enumerate(values_t):
+        valid = ~np.isnan(x)
+        started = ~np.isnan(state)
+        state = np.where(valid, np.where(started, alpha * x + decay * state, x), state)
+        count += valid
+        out[t] = np.where(valid & (count >= min_periods), state, np.nan)
+    return out.T
+
+def sma(close, window=14):
+    close = np.asarray(close, dtype=float)
+    valid = ~np.isnan(close)
+    sums = np.cumsum(np.where(valid, close, 0.0), axis=1)
+    counts = np.cumsum(valid, axis=1)
+    sums[:, window:] = sums[:, window:] - sums[:, :-window]
+    counts[:, window:] = counts[:, window:] - counts[:, :-window]
+    return np.where(valid & (counts == window), sums / window, np.nan)
+
+def ema(close, window=14):
+    return _ewm(np.asarray(close, dtype=float), 2 / (window + 1), window)
+
+def rsi(close, window=14):
+    close = np.asarray(close, dtype=float)
+    valid = ~np.isnan(close)
+    diff = np.full_like(close, np.nan)
+    diff[:, 1:] = close[:, 1:] - close[:, :-1]
+    diff = np.where(valid & np.isnan(diff), 0.0, diff)  # first real bar of each row
+
+    up = _ewm(np.where(valid, np.where(diff > 0, diff, 0.0), np.nan), 1 / window, window)
+    down = _ewm(np.where(valid, np.where(diff < 0, -diff, 0.0), np.nan), 1 / window, window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = np.where(down == 0, 100.0, 100 - 100 / (1 + up / down))
+    return np.where(np.isnan(up) | np.isnan(down), np.nan, out)
+
+def macd(close, window_slow=26, window_fast=12, window_sign=9):
+    """Return (macd, signal, diff) arrays, as ta.trend.MACD."""
+    close = np.asarray(close, dtype=float)
+    line = ema(close, window_fast) - ema(close, window_slow)
+    signal = ema(line, window_sign)
+    return line, signal, line - signal
+
+def macd_diff(close, window_slow=26, window_fast=12, window_sign=9):
+    return macd(close, window_slow, window_fast, window_sign)[2]
+
+if __name__ == '__main__':
+    # Check against ta and time a full-size panel: python -m common.indicators
+    import time
+
+    import ta
+
+    rng = np.random.default_rng(0)
+    n_symbols, n_bars = 2000, 5000
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_symbols, n_bars)), axis=1))
+    starts = rng.integers(0, n_bars // 2, n_symbols)
+    close[np.arange(n_bars) < starts[:, None]] = np.nan  # ragged histories
+
+    start = time.perf_counter()
+    results = {'SMA': sma(close), 'EMA': ema(close), 'RSI': rsi(close), 'MACD': macd_diff(close)}
+    print(f"{n_symbols} x {n_bars}: {time.perf_counter() - start:.2f}s for SMA, EMA, RSI, MACD")
+
+    for row in range(5):
+        series = pd.Series(close[row, starts[row]:])
+        expected = {
+            'SMA': ta.trend.sma_indicator(series, window=14),
+            'EMA': ta.trend.ema_indicator(series, window=14),
+            'RSI': ta.momentum.rsi(series, window=14),
+            'MACD': ta.trend.macd_diff(series),
+        }
+        for name, values in expected.items():
+            np.testing.assert_allclose(results[name][row, starts[row]:], values, rtol=1e-7, atol=1e-7)
+    print("Matches ta within 1e-7")
@@ -0,0 +1,157 @@
+import csv
+import io
+
+# Bytes read when sniffing a header; a header line longer than this is rejected
+HEADER_BYTES = 64 * 1024
+
+# Option chain columns, normalized (uppercase, single spaces)
+OPTION_CHAIN_COLS = [
+    'CALLS OI', 'CALLS CHNG IN OI', 'CALLS VOLUME', 'CALLS IV', 'CALLS LTP',
+    'CALLS CHNG', 'CALLS BID QTY', 'CALLS BID', 'CALLS ASK', 'CALLS ASK QTY',
+    'STRIKE',
+    'PUTS BID QTY', 'PUTS BID', 'PUTS ASK', 'PUTS ASK QTY', 'PUTS CHNG',
+    'PUTS LTP', 'PUTS IV', 'PUTS VOLUME', 'PUTS CHNG IN OI', 'PUTS OI'
+]
+
+# Known file formats: canonical column -> accepted header variants (first match wins)
+FORMATS = {
+    'nse_option_chain': {
+        'label': 'NSE Option Chain',
+        'columns': {col: [col] for col in OPTION_CHAIN_COLS},
+        'required': OPTION_CHAIN_COLS,
+    },
+    'nse_equity': {
+        'label': 'NSE/BSE Historical',
+        'columns': {
+            'Date': ['DATE'],
+            'Series': ['SERIES'],
+            'Open': ['OPEN', 'OPEN PRICE'],
+            'High': ['HIGH', 'HIGH PRICE'],
+            'Low': ['LOW', 'LOW PRICE'],
+            'Prev_Close': ['PREV. CLOSE', 'PREV CLOSE'],
+            'Close': ['CLOSE', 'CLOSE PRICE', 'LTP'],
+            'VWAP': ['VWAP', 'WAP'],
+            'High_52W': ['52W H'],
+            'Low_52W': ['52W L'],
+            'Volume': ['VOLUME', 'NO.OF SHARES', 'NO. OF SHARES'],
+            'Value': ['VALUE', 'TOTAL TURNOVER (RS.)'],
+            'Trades': ['NO OF TRADES', 'NO. OF TRADES'],
+        },
+        'required': ['Date', 'Open', 'High', 'Low', 'Close'],
+    },
+    'equity_pandit': {
+        'label': 'Equity Pandit',
+        'columns': {
+            'Date': ['DATE'],
+            'Close': ['PRICE'],
+            'Open': ['OPEN'],
+            'High': ['HIGH'],
+            'Low': ['LOW'],
+            'Volume': ['VOLUME', 'VOL.'],
+            'Change_Pct': ['CHANGE(%)', 'CHANGE %'],
+        },
+        'required': ['Date', 'Open', 'High', 'Low', 'Close'],
+    },
+}
+
+class SchemaError(ValueError):
+    pass
+
+def normalize_header(name):
+    # ' puts  LTP' -> 'PUTS LTP'
+    return ' '.join(str(name).replace('\ufeff', '').upper().split())
+
+def normalize_cols(cols):
+    return [normalize_header(col) for col in cols]
+
+def _read_head(source, max_bytes):
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            return f.read(max_bytes)
+    pos = source.tell()
+    head = source.read(max_bytes)
+    source.seek(pos)
+    return head.encode('utf-8') if isinstance(head, str) else head
+
+def _xlsx_header(source):
+    from openpyxl import load_workbook
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    wb = load_workbook(source, read_only=True)
+    try:
+        first = next(wb.active.iter_rows(max_row=1, values_only=True), ())
+    finally:
+        wb.close()
+        if hasattr(source, 'seek'):
+            source.seek(0)
+    return [str(v) for v in first if v is not None]
+
+def sniff_header(source, max_bytes=HEADER_BYTES):
+    """Return the raw header names of a CSV/XLSX path or upload without parsing the body."""
+    head = _read_head(source, max_bytes)
+    if head.startswith(b'PK'):
+        return _xlsx_header(source)
+
+    line, newline, _ = head.partition(b'\n')
+    if not newline and len(head) == max_bytes:
+        raise SchemaError(f"No header line found in the first {max_bytes} bytes")
+    if b'\x00' in line:
+        raise SchemaError("File does not look like a CSV (binary content)")
+
+    text = line.decode('utf-8-sig', errors='replace').rstrip('\r')
+    cols = next(csv.reader(io.StringIO(text), skipinitialspace=True), [])
+    if not any(col.strip() for col in cols):
+        raise SchemaError("Header row is empty")
+    return cols
+
+def rename_map(cols, fmt):
+    """Map raw header names to canonical names for a format."""
+    by_norm = {}
+    for raw in cols:
+        by_norm.setdefault(normalize_header(raw), raw)
+
+    mapping = {}
+    for canonical, variants in FORMATS[fmt]['columns'].items():
+        for variant in variants:
+            if variant in by_norm:
+                mapping[by_norm[variant]] = canonical
+                break
+    return mapping
+
+def missing_columns(cols, fmt):
+    found = set(rename_map(cols, fmt).values())
+    return [col for col in FORMATS[fmt]['required'] if col not in found]
+
+def detect_format(cols, candidates=None):
+    # The format with every required column present and the most columns matched
+    best, best_hits = None, 0
+    for fmt in candidates or FORMATS:
+        if missing_columns(cols, fmt):
+            continue
+        hits = len(rename_map(cols, fmt))
+        if hits > best_hits:
+            best, best_hits = fmt, hits
+    return best
+
+def validate_header(source, fmt=None, candidates=None):
+    """Sniff and check a file's header; raise SchemaError before any full parse.
+
+    With no ``fmt`` the format is detected among ``candidates`` (default: all).
+    Returns (format name, raw header names).
+    """
+    cols = sniff_header(source)
+    if fmt is None:
+        fmt = detect_format(cols, candidates)
+        if fmt is None:
+            labels = ', '.join(FORMATS[name]['label'] for name in candidates or FORMATS)
+            raise SchemaError(f"Unrecognized file format (expected one of: {labels}). Columns: {normalize_cols(cols)}")
+    else:
+        missing = missing_columns(cols, fmt)
+        if missing:
+            raise SchemaError(f"Missing columns for {FORMATS[fmt]['label']}: {missing}")
+    return fmt, cols
+
+def apply_schema(df, fmt):
+    """Rename a parsed frame's columns to the format's canonical names."""
+    return df.rename(columns=rename_map(df.columns, fmt))
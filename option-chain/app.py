@@ -1,24 +1,23 @@
+import hashlib
+import io
+import sys
+import time
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import altair as alt
 
+from chain_io import read_option_chain
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.schema import missing_columns, sniff_header
+
 # Constants
 LOT_SIZE = 75  # Nifty lot size
 TARGET_DAILY_PROFIT = 750  # Rs target profit per day
 
-# Required columns normalized
-required_cols_norm = [
-    'CALLS OI', 'CALLS CHNG IN OI', 'CALLS VOLUME', 'CALLS IV', 'CALLS LTP',
-    'CALLS CHNG', 'CALLS BID QTY', 'CALLS BID', 'CALLS ASK', 'CALLS ASK QTY',
-    'STRIKE',
-    'PUTS BID QTY', 'PUTS BID', 'PUTS ASK', 'PUTS ASK QTY', 'PUTS CHNG',
-    'PUTS LTP', 'PUTS IV', 'PUTS VOLUME', 'PUTS CHNG IN OI', 'PUTS OI'
-]
-
-def normalize_cols(cols):
-    return [col.upper().strip() for col in cols]
-
 def tidy_data(df):
     calls = df[['STRIKE', 'CALLS OI', 'CALLS CHNG IN OI', 'CALLS VOLUME', 'CALLS IV', 'CALLS LTP']]
     calls = calls.rename(columns={
@@ -87,8 +86,15 @@ def detect_iv_signal(df, prev_iv_df=None):
     else:
         return "IV stable — no clear signal"
 
+def strike_window(df, atm_strike, filter_range):
+    # df is sorted by STRIKE, so ATM ± N is one contiguous slice found by binary search
+    strikes = df['STRIKE'].to_numpy()
+    lo = np.searchsorted(strikes, atm_strike - filter_range, side='left')
+    hi = np.searchsorted(strikes, atm_strike + filter_range, side='right')
+    return df.iloc[lo:hi]
+
 def recommend_strikes(df, atm_strike, max_strikes=3, filter_range=10):
-    filtered = df[(df['STRIKE'] >= atm_strike - filter_range) & (df['STRIKE'] <= atm_strike + filter_range)]
+    filtered = strike_window(df, atm_strike, filter_range)
     
     median_oi = filtered['OI'].median()
     median_iv = filtered['IV'].median()
@@ -119,16 +125,88 @@ def recommend_strikes(df, atm_strike, max_strikes=3, filter_range=10):
     
     return recommendations[['STRIKE', 'Type', 'Action', 'Premium', 'Lots to target ₹750', 'Rationale']]
 
-def estimate_delta(row):
+def estimate_delta(df):
     # Rough delta estimate (placeholder):
     # - High OI + low volume -> low delta (good for selling)
     # - High volume + low OI -> high delta (good for buying)
-    if row['OI'] > 5000 and row['Volume'] < 1000:
-        return 0.1  # low delta
-    elif row['Volume'] > 3000 and row['OI'] < 3000:
-        return 0.7  # high delta
-    else:
-        return 0.4  # moderate delta
+    # - otherwise moderate delta
+    return np.select(
+        [(df['OI'] > 5000) & (df['Volume'] < 1000), (df['Volume'] > 3000) & (df['OI'] < 3000)],
+        [0.1, 0.7],
+        default=0.4,
+    )
+
+# ---- Cached pipeline stages -----
+# Each stage is keyed on the file digest; the raw bytes are passed as an
+# underscore argument so Streamlit doesn't re-hash them. A sidebar change only
+# reruns what depends on it (the ATM ± N slice, recommendations and charts).
+
+def file_key(uploaded):
+    return hashlib.md5(uploaded.getvalue()).hexdigest()
+
+@st.cache_data(show_spinner=False)
+def load_chain(key, _data):
+    return read_option_chain(io.BytesIO(_data))
+
+@st.cache_data(show_spinner=False)
+def prepare_chain(key, _data):
+    # Tidy frame sorted by strike, with the delta estimate attached
+    tidy_df = tidy_data(load_chain(key, _data))
+    tidy_df['Estimated Delta'] = estimate_delta(tidy_df)
+    return tidy_df.sort_values('STRIKE', kind='stable', ignore_index=True)
+
+@st.cache_data(show_spinner=False)
+def strike_aggregates(key, _data):
+    # One strike x type pass shared by max pain and every chart
+    agg = (
+        prepare_chain(key, _data)
+        .groupby(['STRIKE', 'Type'])
+        .agg(OI=('OI', 'sum'), IV=('IV', 'mean'), Volume=('Volume', 'sum'))
+        .reset_index()
+    )
+    # Bucketed from the summed OI/Volume, so the delta panel describes the same
+    # strike totals as the OI and Volume panels
+    agg['Delta'] = estimate_delta(agg)
+    return agg
+
+@st.cache_data(show_spinner=False)
+def chain_summary(key, _data):
+    tidy_df = prepare_chain(key, _data)
+    atm = find_atm_strike(tidy_df)
+    max_pain = max_pain_strike(strike_aggregates(key, _data))
+    direction = predict_market_direction(tidy_df)
+    return atm, max_pain, direction
+
+def chain_charts(chart_df):
+    # Four views over one dataset; Altair lifts the shared data to a single
+    # top-level entry, so the browser receives the rows once
+    chart_df = chart_df.round({'IV': 2, 'Delta': 2})
+    base = (
+        alt.Chart(chart_df)
+        .encode(x=alt.X('STRIKE:O', title='Strike'), color='Type:N')
+        .properties(width=700, height=300)
+    )
+    chart_oi = base.mark_bar().encode(
+        y=alt.Y('OI:Q', title='Open Interest'), tooltip=['STRIKE', 'Type', 'OI'])
+    chart_iv = base.mark_line(point=True).encode(
+        y='IV:Q', tooltip=['STRIKE', 'Type', 'IV'])
+    chart_vol = base.mark_line(point=True).encode(
+        y='Volume:Q', tooltip=['STRIKE', 'Type', 'Volume'])
+    chart_delta = base.mark_circle(size=60).encode(
+        y=alt.Y('Delta:Q', title='Estimated Delta'), tooltip=['STRIKE', 'Type', 'Delta'])
+    return alt.vconcat(chart_oi, chart_iv, chart_vol, chart_delta)
+
+def payload_stats(chart):
+    # Size of the Vega-Lite spec and the time to serialize it. This is an extra
+    # serialization on top of the one st.altair_chart does, so it's opt-in
+    start = time.perf_counter()
+    spec = chart.to_json()
+    return len(spec.encode('utf-8')), (time.perf_counter() - start) * 1000
+
+@st.cache_data(show_spinner=False)
+def iv_signal_for(key, _data, prev_key, _prev_data):
+    prev_tidy = tidy_data(load_chain(prev_key, _prev_data))
+    return detect_iv_signal(prepare_chain(key, _data), prev_tidy)
 
 # ---- Streamlit UI -----
 
@@ -139,49 +217,44 @@ uploaded_file = st.file_uploader("Upload your Option Chain CSV file", type=["csv
 # Option for ATM ± N strikes filter
 filter_atm_n = st.sidebar.slider("Filter strikes by ATM ± N", min_value=5, max_value=20, value=10, step=1)
 
+# Chart payload diagnostics (costs one extra serialization of the charts)
+show_payload = st.sidebar.checkbox("Show chart payload size", value=False)
+
 # Upload previous day file for IV signal comparison (optional)
 prev_file = st.sidebar.file_uploader("Upload previous day Option Chain CSV for IV signal (optional)", type=["csv", "txt"])
 
 if uploaded_file:
     try:
-        df_raw = pd.read_csv(uploaded_file, sep=',')
-        df_raw.columns = normalize_cols(df_raw.columns)
-        
-        missing = set(required_cols_norm) - set(df_raw.columns)
+        # Validate the header before parsing the body
+        missing = missing_columns(sniff_header(uploaded_file), 'nse_option_chain')
         if missing:
-            st.error(f"Missing columns (normalized): {missing}")
+            st.error(f"Missing columns (normalized): {set(missing)}")
             st.stop()
         
         st.success("All required columns are present (normalized)!")
+        data = uploaded_file.getvalue()
+        key = file_key(uploaded_file)
         
-        # Prepare tidy data
-        tidy_df = tidy_data(df_raw)
-        
-        # Estimate delta for visualization
-        tidy_df['Estimated Delta'] = tidy_df.apply(estimate_delta, axis=1)
+        # Prepare tidy data (cached; includes the delta estimate for visualization)
+        tidy_df = prepare_chain(key, data)
+        atm, (max_pain_str, max_pain_val), direction = chain_summary(key, data)
         
         # Show sample
         st.subheader("Tidied Option Chain Data Sample")
         st.dataframe(tidy_df.head(15))
         
         # ATM Strike
-        atm = find_atm_strike(tidy_df)
         st.markdown(f"### ATM Strike: **{atm}**")
         
         # Max Pain
-        max_pain_str, max_pain_val = max_pain_strike(tidy_df)
         st.markdown(f"### Max Pain Strike: **{max_pain_str}** with Total OI = {max_pain_val}")
         
         # Market Direction
-        direction = predict_market_direction(tidy_df)
         st.markdown(f"### Predicted Market Direction: **{direction}**")
         
         # IV signal detection (if previous day file uploaded)
         if prev_file:
-            prev_df = pd.read_csv(prev_file, sep=',')
-            prev_df.columns = normalize_cols(prev_df.columns)
-            prev_tidy = tidy_data(prev_df)
-            iv_signal = detect_iv_signal(tidy_df, prev_tidy)
+            iv_signal = iv_signal_for(key, data, file_key(prev_file), prev_file.getvalue())
         else:
             iv_signal = "Upload previous day file to detect IV Crush / Rising IV signals."
         st.markdown(f"### IV Signal: **{iv_signal}**")
@@ -194,83 +267,15 @@ if uploaded_file:
         # Visualizations
         st.subheader("Visualizations")
         
-        # OI Bar chart
-        oi_chart = (
-            tidy_df.groupby(['STRIKE', 'Type'])['OI']
-            .sum()
-            .reset_index()
-        )
-        oi_chart = oi_chart[(oi_chart['STRIKE'] >= atm - filter_atm_n) & (oi_chart['STRIKE'] <= atm + filter_atm_n)]
-        chart_oi = (
-            alt.Chart(oi_chart)
-            .mark_bar()
-            .encode(
-                x=alt.X('STRIKE:O', title='Strike'),
-                y=alt.Y('OI:Q', title='Open Interest'),
-                color='Type:N',
-                tooltip=['STRIKE', 'Type', 'OI']
-            )
-            .properties(width=700, height=300)
-        )
-        st.altair_chart(chart_oi, use_container_width=True)
-        
-        # IV line chart
-        iv_chart = (
-            tidy_df.groupby(['STRIKE', 'Type'])['IV']
-            .mean()
-            .reset_index()
-        )
-        iv_chart = iv_chart[(iv_chart['STRIKE'] >= atm - filter_atm_n) & (iv_chart['STRIKE'] <= atm + filter_atm_n)]
-        chart_iv = (
-            alt.Chart(iv_chart)
-            .mark_line(point=True)
-            .encode(
-                x='STRIKE:O',
-                y='IV:Q',
-                color='Type:N',
-                tooltip=['STRIKE', 'Type', 'IV']
-            )
-            .properties(width=700, height=300)
-        )
-        st.altair_chart(chart_iv, use_container_width=True)
-        
-        # Volume line chart
-        vol_chart = (
-            tidy_df.groupby(['STRIKE', 'Type'])['Volume']
-            .sum()
-            .reset_index()
-        )
-        vol_chart = vol_chart[(vol_chart['STRIKE'] >= atm - filter_atm_n) & (vol_chart['STRIKE'] <= atm + filter_atm_n)]
-        chart_vol = (
-            alt.Chart(vol_chart)
-            .mark_line(point=True)
-            .encode(
-                x='STRIKE:O',
-                y='Volume:Q',
-                color='Type:N',
-                tooltip=['STRIKE', 'Type', 'Volume']
-            )
-            .properties(width=700, height=300)
-        )
-        st.altair_chart(chart_vol, use_container_width=True)
+        # Strike x type aggregate is cached; only the ATM ± N slice is recomputed
+        agg_window = strike_window(strike_aggregates(key, data), atm, filter_atm_n)
         
-        # Estimated Delta scatter plot
-        delta_chart = (
-            tidy_df[(tidy_df['STRIKE'] >= atm - filter_atm_n) & (tidy_df['STRIKE'] <= atm + filter_atm_n)]
-            .copy()
-        )
-        chart_delta = (
-            alt.Chart(delta_chart)
-            .mark_circle(size=60)
-            .encode(
-                x='STRIKE:O',
-                y='Estimated Delta:Q',
-                color='Type:N',
-                tooltip=['STRIKE', 'Type', 'Estimated Delta']
-            )
-            .properties(width=700, height=300)
-        )
-        st.altair_chart(chart_delta, use_container_width=True)
+        # OI bars, IV and Volume lines, Estimated Delta scatter from one dataset
+        charts = chain_charts(agg_window)
+        st.altair_chart(charts, use_container_width=True)
+        if show_payload:
+            payload_bytes, build_ms = payload_stats(charts)
+            st.caption(f"Chart payload: {len(agg_window)} rows, {payload_bytes / 1024:.1f} KB, serialized in {build_ms:.1f} ms")
         
     except Exception as e:
         st.error(f"Error processing file: {e}")
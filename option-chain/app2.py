@@ -1,18 +1,10 @@
-import streamlit as st
-import pandas as pd
+import sys
+from pathlib import Path
 
-# Your required columns normalized (uppercase, no spaces)
-required_cols_norm = [
-    'CALLS OI', 'CALLS CHNG IN OI', 'CALLS VOLUME', 'CALLS IV', 'CALLS LTP',
-    'CALLS CHNG', 'CALLS BID QTY', 'CALLS BID', 'CALLS ASK', 'CALLS ASK QTY',
-    'STRIKE',
-    'PUTS BID QTY', 'PUTS BID', 'PUTS ASK', 'PUTS ASK QTY', 'PUTS CHNG',
-    'PUTS LTP', 'PUTS IV', 'PUTS VOLUME', 'PUTS CHNG IN OI', 'PUTS OI'
-]
+import streamlit as st
 
-# Normalize for matching: uppercase + remove extra spaces (if any)
-def normalize_cols(cols):
-    return [col.upper().strip() for col in cols]
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.schema import FORMATS, detect_format, missing_columns, normalize_cols, sniff_header
 
 st.title("Option Chain Column Checker")
 
@@ -20,18 +12,21 @@ uploaded_file = st.file_uploader("Upload your Option Chain CSV file", type=["csv
 
 if uploaded_file:
     try:
-        # Try reading with comma separator (based on your example)
-        df = pd.read_csv(uploaded_file, sep=',')
-        df.columns = normalize_cols(df.columns)
-        
+        # Only the header bytes are read; the body is never parsed
+        cols = sniff_header(uploaded_file)
+
         st.write("Columns found in file (normalized):")
-        st.write(df.columns.tolist())
-        
-        missing = set(required_cols_norm) - set(df.columns)
+        st.write(normalize_cols(cols))
+
+        fmt = detect_format(cols)
+        if fmt:
+            st.write(f"Detected format: {FORMATS[fmt]['label']}")
+
+        missing = missing_columns(cols, 'nse_option_chain')
         if missing:
-            st.error(f"Missing columns (normalized): {missing}")
+            st.error(f"Missing columns (normalized): {set(missing)}")
         else:
             st.success("All required columns are present (normalized)!")
-    
+
     except Exception as e:
         st.error(f"Error reading file: {e}")
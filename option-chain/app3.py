@@ -1,46 +1,50 @@
+import hashlib
+import sys
+from pathlib import Path
+
 import streamlit as st
-import pandas as pd
 
-# Columns to normalize & convert numeric
-required_cols_norm = [
-    'CALLS OI', 'CALLS CHNG IN OI', 'CALLS VOLUME', 'CALLS IV', 'CALLS LTP',
-    'CALLS CHNG', 'CALLS BID QTY', 'CALLS BID', 'CALLS ASK', 'CALLS ASK QTY',
-    'STRIKE',
-    'PUTS BID QTY', 'PUTS BID', 'PUTS ASK', 'PUTS ASK QTY', 'PUTS CHNG',
-    'PUTS LTP', 'PUTS IV', 'PUTS VOLUME', 'PUTS CHNG IN OI', 'PUTS OI'
-]
+from chain_io import iter_option_chain
 
-def normalize_cols(cols):
-    return [col.upper().strip() for col in cols]
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.export import MIME_TYPES, export_bytes
+from common.schema import normalize_cols, sniff_header
 
 st.title("Option Chain CSV Cleaner & Converter")
 
+@st.cache_data(show_spinner=False, max_entries=2)
+def cleaned_outputs(key, _uploaded):
+    # Keyed on the file digest: clicking a download button reruns the script,
+    # and that shouldn't parse and write the whole file again
+    return export_bytes(iter_option_chain(_uploaded), ['csv', 'parquet'])
+
 uploaded_file = st.file_uploader("Upload your Option Chain CSV file", type=["csv", "txt"])
 
 if uploaded_file:
     try:
-        # Read file and normalize columns
-        df = pd.read_csv(uploaded_file)
-        df.columns = normalize_cols(df.columns)
-
+        # Only the header is parsed here; the body is typed chunk by chunk below
         st.write("Original Columns:")
-        st.write(df.columns.tolist())
+        st.write(normalize_cols(sniff_header(uploaded_file)))
 
-        # Convert required columns to numeric, coercing errors to NaN then fill with 0
-        for col in required_cols_norm:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        # Numeric columns are typed at parse time ('-' -> NaN -> 0, '1,234' -> 1234);
+        # both outputs are written in one pass over the parsed chunks
+        files = cleaned_outputs(hashlib.md5(uploaded_file.getvalue()).hexdigest(), uploaded_file)
 
         st.subheader("Preview of cleaned data")
-        st.dataframe(df.head())
+        st.dataframe(next(iter_option_chain(uploaded_file, chunksize=5)))
 
-        # Prepare CSV download
-        csv = df.to_csv(index=False).encode('utf-8')
+        # Prepare downloads
         st.download_button(
             label="Download cleaned CSV",
-            data=csv,
+            data=files['csv'],
             file_name='option_chain_cleaned.csv',
-            mime='text/csv'
+            mime=MIME_TYPES['csv']
+        )
+        st.download_button(
+            label="Download cleaned Parquet",
+            data=files['parquet'],
+            file_name='option_chain_cleaned.parquet',
+            mime=MIME_TYPES['parquet']
         )
 
     except Exception as e:
@@ -1,17 +1,12 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
-import pandas as pd
 
-# Required columns normalized
-required_cols_norm = [
-    'CALLS OI', 'CALLS CHNG IN OI', 'CALLS VOLUME', 'CALLS IV', 'CALLS LTP',
-    'CALLS CHNG', 'CALLS BID QTY', 'CALLS BID', 'CALLS ASK', 'CALLS ASK QTY',
-    'STRIKE',
-    'PUTS BID QTY', 'PUTS BID', 'PUTS ASK', 'PUTS ASK QTY', 'PUTS CHNG',
-    'PUTS LTP', 'PUTS IV', 'PUTS VOLUME', 'PUTS CHNG IN OI', 'PUTS OI'
-]
+from chain_io import read_option_chain
 
-def normalize_cols(cols):
-    return [col.upper().strip() for col in cols]
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.schema import missing_columns, sniff_header
 
 def suggest_safe_strikes(df, lot_size=75, daily_target=750):
     premium_threshold = daily_target / lot_size  # e.g. 10 Rs premium per option
@@ -39,18 +34,13 @@ uploaded_file = st.file_uploader("Upload your Option Chain CSV file", type=["csv
 
 if uploaded_file:
     try:
-        # Load data & normalize columns
-        df = pd.read_csv(uploaded_file)
-        df.columns = normalize_cols(df.columns)
-
-        # Check required columns
-        missing = set(required_cols_norm) - set(df.columns)
+        # Check required columns from the header alone, before parsing the body
+        missing = missing_columns(sniff_header(uploaded_file), 'nse_option_chain')
         if missing:
             st.error(f"Missing columns in file: {missing}")
         else:
-            # Convert columns to numeric safely
-            for col in required_cols_norm:
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+            # Load data; numeric columns are typed and zero-filled while parsing
+            df = read_option_chain(uploaded_file)
 
             st.subheader("Cleaned Data Preview")
             st.dataframe(df.head())
@@ -0,0 +1,94 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.export import CsvWriter, ParquetWriter, write_frames
+from common.schema import OPTION_CHAIN_COLS as required_cols_norm, normalize_header, rename_map, sniff_header
+
+# Placeholders NSE/BSE put in cells with no quote
+NA_TOKENS = ['-', '--', 'NA', 'N/A', 'nan', '']
+
+# Rows per chunk; large or multi-expiry files never sit in memory as raw text
+DEFAULT_CHUNKSIZE = 50_000
+
+def _rewind(source):
+    if hasattr(source, 'seek'):
+        source.seek(0)
+
+def column_dtypes(raw_cols):
+    """Parse-time dtypes keyed on the raw header names (quirks like ' PUTS LTP' included).
+
+    Chain columns are float64; everything else is read as text, so every chunk
+    (fast path or fallback) has the same dtypes and a Parquet schema fixed
+    from the first chunk fits the rest.
+    """
+    numeric = rename_map(raw_cols, 'nse_option_chain')
+    return {raw: 'float64' if raw in numeric else str for raw in raw_cols}
+
+def _finish_chunk(chunk):
+    known = rename_map(chunk.columns, 'nse_option_chain')
+    chunk.columns = [known.get(col, normalize_header(col)) for col in chunk.columns]
+    # Rows without a strike (NSE's "Total" footer, repeated headers) aren't quotes;
+    # zero-filling them would add a phantom strike 0 to ATM and max pain
+    if 'STRIKE' in chunk.columns:
+        chunk = chunk.dropna(subset=['STRIKE'])
+    numeric = [col for col in required_cols_norm if col in chunk.columns]
+    chunk[numeric] = chunk[numeric].fillna(0)
+    return chunk
+
+def _coerce_chunk(chunk, numeric_raw):
+    # Slow path: drop repeated header lines, strip thousands separators and
+    # coerce whatever is left to NaN
+    repeats = pd.Series(False, index=chunk.index)
+    for col in numeric_raw:
+        repeats |= chunk[col].map(normalize_header, na_action='ignore') == normalize_header(col)
+    chunk = chunk[~repeats].copy()
+    for col in numeric_raw:
+        # float64 like the fast path: to_numeric would give int64 for whole numbers
+        chunk[col] = pd.to_numeric(chunk[col].str.replace(',', '', regex=False), errors='coerce').astype('float64')
+    return chunk
+
+def iter_option_chain(source, chunksize=DEFAULT_CHUNKSIZE):
+    """Yield cleaned chunks with numeric columns typed by the CSV parser itself."""
+    _rewind(source)
+    raw_cols = sniff_header(source)
+    dtypes = column_dtypes(raw_cols)
+    reader = pd.read_csv(source, dtype=dtypes, na_values=NA_TOKENS, thousands=',',
+                         skipinitialspace=True, chunksize=chunksize)
+    rows_done = 0
+    try:
+        for chunk in reader:
+            rows_done += len(chunk)
+            yield _finish_chunk(chunk)
+    except ValueError:
+        # Stray text in a numeric column (e.g. a repeated header between expiries):
+        # finish the remaining rows the old way instead of failing the whole file
+        _rewind(source)
+        reader = pd.read_csv(source, dtype={raw: str for raw in raw_cols}, na_values=NA_TOKENS,
+                             skipinitialspace=True, chunksize=chunksize, skiprows=range(1, rows_done + 1))
+        numeric_raw = [raw for raw, dtype in dtypes.items() if dtype == 'float64']
+        for chunk in reader:
+            yield _finish_chunk(_coerce_chunk(chunk, numeric_raw))
+
+def read_option_chain(source, chunksize=DEFAULT_CHUNKSIZE):
+    return pd.concat(iter_option_chain(source, chunksize), ignore_index=True)
+
+def write_cleaned(source, csv_sink=None, parquet_sink=None, chunksize=DEFAULT_CHUNKSIZE):
+    """Stream the cleaned chain into CSV and/or Parquet sinks (paths or binary buffers).
+
+    Returns the number of rows written.
+    """
+    writers = []
+    if csv_sink is not None:
+        writers.append(CsvWriter(csv_sink))
+    if parquet_sink is not None:
+        writers.append(ParquetWriter(parquet_sink))
+    return write_frames(iter_option_chain(source, chunksize), writers)
+
+if __name__ == '__main__':
+    # Batch use: python chain_io.py input.csv output_basename
+    src, out = sys.argv[1], sys.argv[2]
+    n = write_cleaned(src, csv_sink=f'{out}.csv', parquet_sink=f'{out}.parquet')
+    print(f'Wrote {n} rows to {out}.csv and {out}.parquet')
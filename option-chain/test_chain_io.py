@@ -0,0 +1,37 @@
+import io
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from chain_io import read_option_chain, write_cleaned
+from common.schema import OPTION_CHAIN_COLS
+
+def _chain_csv(*rows):
+    lines = [','.join(OPTION_CHAIN_COLS)]
+    for row in rows:
+        lines.append(','.join(OPTION_CHAIN_COLS) if row == 'header' else ','.join(row))
+    return ('\n'.join(lines) + '\n').encode('utf-8')
+
+def _row(strike, iv='12'):
+    values = {col: '100' for col in OPTION_CHAIN_COLS}
+    values.update({'STRIKE': str(strike), 'CALLS IV': iv})
+    return [values[col] for col in OPTION_CHAIN_COLS]
+
+def test_repeated_header_in_first_chunk_streams_to_parquet():
+    # The first chunk takes the fallback path; later chunks must keep its dtypes
+    data = _chain_csv('header', _row(22000), 'header', _row(22050), _row(22100, iv='12.5'))
+    parquet = io.BytesIO()
+    rows = write_cleaned(io.BytesIO(data), csv_sink=io.BytesIO(), parquet_sink=parquet, chunksize=2)
+
+    out = pd.read_parquet(io.BytesIO(parquet.getvalue()))
+    assert rows == 3
+    assert out['STRIKE'].tolist() == [22000, 22050, 22100]
+    assert out['CALLS IV'].tolist() == [12, 12, 12.5]
+    assert (out[OPTION_CHAIN_COLS].dtypes == 'float64').all()
+
+def test_fallback_and_fast_path_give_the_same_dtypes():
+    fast = read_option_chain(io.BytesIO(_chain_csv(_row(22000), _row(22050))))
+    fallback = read_option_chain(io.BytesIO(_chain_csv('header', _row(22000), _row(22050))))
+    pd.testing.assert_frame_equal(fast, fallback)
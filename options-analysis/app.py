@@ -1,8 +1,16 @@
+import sys
+from pathlib import Path
+
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 from ta.momentum import RSIIndicator
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.schema import SchemaError, apply_schema, validate_header
+from backtest import backtest, threshold_grid
+from seasonality import build_panel, seasonality_report, seasonality_table, trading_days
+
 st.set_page_config(page_title="Stock Option Analyzer", layout="wide")
 st.title("📈 Stock Option Profit, Trend & Prediction Analyzer (NSE/BSE Compatible)")
 
@@ -11,6 +19,13 @@ uploaded_file = st.file_uploader("Upload NSE/BSE File (.csv or .xlsx)", type=['c
 
 # ------------------ Load and Normalize Data ------------------
 def load_stock_data(uploaded_file):
+    # Reject unknown layouts from the header alone, before parsing the body
+    try:
+        fmt, _ = validate_header(uploaded_file, candidates=['nse_equity', 'equity_pandit'])
+    except SchemaError as e:
+        st.error(str(e))
+        return None
+
     if uploaded_file.name.endswith('.csv'):
         df = pd.read_csv(uploaded_file)
     elif uploaded_file.name.endswith('.xlsx'):
@@ -20,30 +35,7 @@ def load_stock_data(uploaded_file):
         return None
 
     # Standardize column names
-    df.columns = df.columns.str.upper().str.strip()
-
-    rename_map = {
-        'DATE': 'Date',
-        'OPEN': 'Open',
-        'HIGH': 'High',
-        'LOW': 'Low',
-        'PREV. CLOSE': 'Prev_Close',
-        'LTP': 'Close',         # fallback for Close
-        'CLOSE': 'Close',
-        'VWAP': 'VWAP',
-        '52W H': 'High_52W',
-        '52W L': 'Low_52W',
-        'VOLUME': 'Volume',
-        'VALUE': 'Value',
-        'NO OF TRADES': 'Trades',
-        'SERIES': 'Series'
-    }
-
-    df = df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns})
-
-    if 'Date' not in df.columns:
-        st.error("Missing 'Date' column.")
-        return None
+    df = apply_schema(df, fmt)
 
     try:
         df['Date'] = pd.to_datetime(df['Date'])
@@ -51,17 +43,25 @@ def load_stock_data(uploaded_file):
         st.error(f"Date parsing failed: {e}")
         return None
 
+    # Drop weekends and zero-volume sessions (no holiday calendar is bundled;
+    # a holiday that still has a traded row stays in)
+    df = trading_days(df)
     df['Weekday'] = df['Date'].dt.day_name()
-    df = df[df['Weekday'] != 'Saturday']
-
-    required_cols = ['Open', 'High', 'Low', 'Close']
-    for col in required_cols:
-        if col not in df.columns:
-            st.error(f"Missing required column: {col}")
-            return None
 
     return df
 
+@st.cache_data
+def cached_seasonality(panel, by):
+    return seasonality_report(panel, by=by)
+
+@st.cache_data
+def cached_backtest(frames, upper, lower):
+    return backtest(frames, upper, lower)
+
+@st.cache_data
+def cached_threshold_grid(frames):
+    return threshold_grid(frames)
+
 # ------------------ Main Logic ------------------
 if uploaded_file:
     df = load_stock_data(uploaded_file)
@@ -109,6 +109,29 @@ if uploaded_file:
             )
             st.plotly_chart(fig2, use_container_width=True)
 
+        # ------------------ Cross-Symbol Seasonality ------------------
+        st.subheader("🗓️ Weekday Seasonality Across Symbols (Bootstrap 95% CI)")
+        extra_files = st.file_uploader("Add more NSE/BSE files to compare symbols", type=['csv', 'xlsx'],
+                                       accept_multiple_files=True)
+        frames = {Path(uploaded_file.name).stem: df}
+        for extra_file in extra_files or []:
+            extra_df = load_stock_data(extra_file)
+            if extra_df is not None:
+                frames[Path(extra_file.name).stem] = extra_df
+
+        panel = build_panel(frames)
+        split_expiry = st.checkbox("Split by expiry week", value=False)
+        by = ('Symbol', 'Expiry_Week', 'Weekday') if split_expiry else ('Symbol', 'Weekday')
+        report = cached_seasonality(panel, by)
+        st.dataframe(report)
+        st.caption("Edge = weekday whose up-frequency differs from the symbol's other days, "
+                   "significant after Benjamini-Hochberg correction (5% FDR) across all rows.")
+
+        heat = seasonality_table(panel)['Up_Freq'].unstack('Weekday')
+        fig_heat = px.imshow(heat, text_auto='.2f', color_continuous_scale='RdYlGn', zmin=0.3, zmax=0.7,
+                             title="Up-Day Frequency by Symbol and Weekday")
+        st.plotly_chart(fig_heat, use_container_width=True)
+
         # ------------------ Trend Detection ------------------
         st.subheader("📉 Trend Detection (Last 30 Days)")
         trend_df = filtered_df.sort_values('Date').copy()
@@ -154,5 +177,20 @@ if uploaded_file:
             suggestion = "Buy Put"
 
         st.success(f"Latest Trend: **{last_trend}**, RSI: **{rsi:.2f}** → Suggested Action: **{suggestion}**")
+
+        # ------------------ Backtest of the Suggestion Rule ------------------
+        st.subheader("🧪 Backtest: How the Suggestion Rule Did Historically")
+        bt_col1, bt_col2 = st.columns(2)
+        upper = bt_col1.slider("Sell Call when RSI above", min_value=55, max_value=90, value=70, step=5)
+        lower = bt_col2.slider("Sell Put when RSI below", min_value=10, max_value=45, value=30, step=5)
+        st.dataframe(cached_backtest(frames, upper, lower))
+        st.caption("Each day's suggestion is scored on the next day: sells win if that side is not a profit day, "
+                   "buys win if it is.")
+
+        grid = cached_threshold_grid(frames)
+        heat = grid[grid['Action'] == 'All'].pivot(index='Upper', columns='Lower', values='Hit_Rate')
+        fig_grid = px.imshow(heat, text_auto='.1f', color_continuous_scale='RdYlGn',
+                             title="Overall Hit Rate (%) by RSI Thresholds (all symbols)")
+        st.plotly_chart(fig_grid, use_container_width=True)
 else:
     st.info("Please upload a file to begin.")
@@ -1,8 +1,14 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.graph_objs as go
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.schema import SchemaError, apply_schema, validate_header
+
 # RSI Calculation
 def calculate_rsi(data, period=14):
     delta = data['Close'].diff()
@@ -32,24 +38,17 @@ st.title("📈 Stock Trend & RSI Analyzer")
 uploaded_file = st.file_uploader("Upload your CSV file", type=['csv'])
 
 if uploaded_file is not None:
+    # Check the header before parsing the body
+    try:
+        validate_header(uploaded_file, 'equity_pandit')
+    except SchemaError as e:
+        st.error(str(e))
+        st.stop()
+
     df = pd.read_csv(uploaded_file)
 
-    # Convert column names to uppercase
-    df.columns = [col.upper().strip() for col in df.columns]
-
-    # Updated renaming based on your format
-    rename_map = {
-        'DATE': 'Date',
-        'PRICE': 'Close',  # Treat PRICE as Close
-        'OPEN': 'Open',
-        'HIGH': 'High',
-        'LOW': 'Low',
-        'VOLUME': 'Volume',
-        'CHANGE(%)': 'Change_Pct'
-    }
-
-    # Rename and drop any extra columns
-    df = df.rename(columns=rename_map)
+    # Rename to standard columns (PRICE is treated as Close) and drop any extra columns
+    df = apply_schema(df, 'equity_pandit')
     df = df[[col for col in ['Date', 'Open', 'High', 'Low', 'Close', 'Volume', 'Change_Pct'] if col in df.columns]]
 
     df['Date'] = pd.to_datetime(df['Date'])
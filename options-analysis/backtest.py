@@ -0,0 +1,108 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.indicators import rsi
+
+# Signal codes used in the arrays below; -1 is Hold
+ACTIONS = ['Sell Call', 'Sell Put', 'Buy Call', 'Buy Put']
+HOLD = -1
+
+def stack_histories(frames):
+    """Date-sorted Open/Close of each symbol as (symbols x bars) arrays, NaN-padded at the end."""
+    symbols = list(frames)
+    histories = [frames[s].sort_values('Date') for s in symbols]
+    n_bars = max(len(h) for h in histories)
+    open_ = np.full((len(symbols), n_bars), np.nan)
+    close = np.full((len(symbols), n_bars), np.nan)
+    for i, h in enumerate(histories):
+        open_[i, :len(h)] = h['Open'].to_numpy(dtype=float)
+        close[i, :len(h)] = h['Close'].to_numpy(dtype=float)
+    return symbols, open_, close
+
+def prepare(open_, close, window=14):
+    """Everything the rule and its scoring need, computed once for all thresholds."""
+    trend = np.full_like(close, np.nan)
+    trend[:, 1:] = np.sign(close[:, 1:] - close[:, :-1])
+
+    call_profit = close > open_
+    put_profit = close < open_
+    next_call = np.zeros_like(call_profit)
+    next_put = np.zeros_like(put_profit)
+    next_valid = np.zeros_like(call_profit)
+    next_call[:, :-1] = call_profit[:, 1:]
+    next_put[:, :-1] = put_profit[:, 1:]
+    next_valid[:, :-1] = ~np.isnan(close[:, 1:]) & ~np.isnan(close[:, :-1])
+
+    # The trend fallback doesn't depend on the RSI thresholds
+    trend_signal = np.select([trend > 0, trend < 0], [2, 3], default=HOLD)
+    return {'rsi': rsi(close, window), 'trend_signal': trend_signal,
+            'next_call': next_call, 'next_put': next_put, 'next_valid': next_valid}
+
+def rule_signals(rsi_values, trend_signal, upper=70, lower=30):
+    # Same precedence as "Tomorrow's Option Suggestion": RSI extremes first, then the last trend
+    return np.where(rsi_values > upper, 0, np.where(rsi_values < lower, 1, trend_signal))
+
+def score_signals(signals, next_call, next_put, next_valid):
+    """Per symbol and action: (signals, hits), each of shape (symbols x 4).
+
+    A sold call wins if the next day is not a Call_Profit day, a sold put if it
+    is not a Put_Profit day; bought options need the matching profit day.
+    """
+    # Even codes are calls, codes >= 2 are buys: a buy needs the profit day, a sale its absence
+    wins = np.where(signals % 2 == 0, next_call, next_put) == (signals >= 2)
+    taken = (signals != HOLD) & next_valid
+
+    # One bincount over (symbol, action) keys instead of a mask per action
+    n_symbols = signals.shape[0]
+    keys = (np.arange(n_symbols)[:, None] * len(ACTIONS) + signals)[taken]
+    size = n_symbols * len(ACTIONS)
+    counts = np.bincount(keys, minlength=size).reshape(n_symbols, len(ACTIONS))
+    hits = np.bincount(keys[wins[taken]], minlength=size).reshape(n_symbols, len(ACTIONS))
+    return counts, hits
+
+def backtest(frames, upper=70, lower=30, window=14):
+    """Hit rate of every historical suggestion, per symbol and action."""
+    symbols, open_, close = stack_histories(frames)
+    prep = prepare(open_, close, window)
+    signals = rule_signals(prep['rsi'], prep['trend_signal'], upper, lower)
+    counts, hits = score_signals(signals, prep['next_call'], prep['next_put'], prep['next_valid'])
+
+    report = pd.DataFrame({
+        'Symbol': np.repeat(symbols, len(ACTIONS)),
+        'Action': np.tile(ACTIONS, len(symbols)),
+        'Signals': counts.ravel(),
+        'Hits': hits.ravel(),
+    })
+    report['Hit_Rate'] = report['Hits'] / report['Signals'].replace(0, np.nan) * 100
+    return report
+
+def threshold_grid(frames, uppers=range(60, 90, 5), lowers=range(15, 45, 5), window=14, n_jobs=None):
+    """Overall and per-action hit rates for every (upper, lower) RSI threshold pair.
+
+    RSI and next-day outcomes are computed once; threshold pairs are scored in
+    parallel threads (the work is numpy array ops, which release the GIL).
+    """
+    _, open_, close = stack_histories(frames)
+    prep = prepare(open_, close, window)
+
+    def score(pair):
+        upper, lower = pair
+        signals = rule_signals(prep['rsi'], prep['trend_signal'], upper, lower)
+        counts, hits = score_signals(signals, prep['next_call'], prep['next_put'], prep['next_valid'])
+        counts, hits = counts.sum(axis=0), hits.sum(axis=0)
+        rows = [(upper, lower, action, counts[i], hits[i]) for i, action in enumerate(ACTIONS)]
+        rows.append((upper, lower, 'All', counts.sum(), hits.sum()))
+        return rows
+
+    pairs = [(u, l) for u in uppers for l in lowers if l < u]
+    with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+        rows = [row for result in pool.map(score, pairs) for row in result]
+
+    grid = pd.DataFrame(rows, columns=['Upper', 'Lower', 'Action', 'Signals', 'Hits'])
+    grid['Hit_Rate'] = grid['Hits'] / grid['Signals'].replace(0, np.nan) * 100
+    return grid
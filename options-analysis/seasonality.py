@@ -0,0 +1,141 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']
+
+# NSE monthly expiry: last Thursday of the month
+EXPIRY_WEEKDAY = 3
+
+def trading_days(df, holidays=None):
+    """Keep Monday-Friday sessions that actually traded.
+
+    Weekends and zero-volume rows are always dropped; exchange holidays only if
+    a ``holidays`` list is passed (otherwise a zero-volume row is the only sign
+    of one).
+    """
+    mask = df['Date'].dt.dayofweek < 5
+    if holidays is not None:
+        mask &= ~df['Date'].dt.normalize().isin(pd.to_datetime(holidays))
+    if 'Volume' in df.columns:
+        volume = pd.to_numeric(df['Volume'], errors='coerce')
+        mask &= ~(volume == 0)
+    return df[mask]
+
+def expiry_week(dates, expiry_weekday=EXPIRY_WEEKDAY):
+    # True for dates in the same Mon-Sun week as their month's last expiry weekday
+    month_end = dates + pd.offsets.MonthEnd(0)
+    expiry = month_end - pd.to_timedelta((month_end.dt.dayofweek - expiry_weekday) % 7, unit='D')
+    week_start = dates - pd.to_timedelta(dates.dt.dayofweek, unit='D')
+    expiry_week_start = expiry - pd.to_timedelta(expiry.dt.dayofweek, unit='D')
+    return week_start.dt.normalize() == expiry_week_start.dt.normalize()
+
+def build_panel(frames, holidays=None, expiry_weekday=EXPIRY_WEEKDAY):
+    """Stack {symbol: OHLC frame} into one long panel of daily moves."""
+    parts = []
+    for symbol, df in frames.items():
+        df = trading_days(df[['Date', 'Open', 'Close'] + (['Volume'] if 'Volume' in df.columns else [])], holidays)
+        parts.append(df.assign(Symbol=symbol))
+    panel = pd.concat(parts, ignore_index=True)
+
+    panel['Weekday'] = pd.Categorical(panel['Date'].dt.day_name(), categories=WEEKDAYS, ordered=True)
+    panel['Expiry_Week'] = expiry_week(panel['Date'], expiry_weekday)
+    panel['Move_Pct'] = (panel['Close'] / panel['Open'] - 1) * 100
+    panel['Up'] = panel['Close'] > panel['Open']
+    panel['Down'] = panel['Close'] < panel['Open']
+    return panel[['Symbol', 'Date', 'Weekday', 'Expiry_Week', 'Move_Pct', 'Up', 'Down']]
+
+def seasonality_table(panel, by=('Symbol', 'Weekday')):
+    """Up/down frequency and mean move per group, for every symbol in one groupby."""
+    return panel.groupby(list(by), observed=True).agg(
+        Days=('Up', 'size'),
+        Up_Freq=('Up', 'mean'),
+        Down_Freq=('Down', 'mean'),
+        Mean_Move_Pct=('Move_Pct', 'mean'),
+    )
+
+def _bootstrap_groups(groups, n_boot, alpha, seed):
+    # groups: list of (key, group number, (n, 2) array of [Up, Move_Pct])
+    rows = []
+    for key, number, values in groups:
+        rng = np.random.default_rng([seed, number])
+        idx = rng.integers(0, len(values), size=(n_boot, len(values)))
+        means = values[idx].mean(axis=1)
+        low, high = np.quantile(means, [alpha / 2, 1 - alpha / 2], axis=0)
+        rows.append((*key, low[0], high[0], low[1], high[1]))
+    return rows
+
+def bootstrap_ci(panel, by=('Symbol', 'Weekday'), n_boot=1000, alpha=0.05, n_jobs=None, seed=42):
+    """Percentile bootstrap CIs for Up_Freq and Mean_Move_Pct per group.
+
+    Groups are resampled in parallel worker processes (n_jobs=1 runs inline).
+    """
+    by = list(by)
+    groups = [
+        (key if isinstance(key, tuple) else (key,), number, g[['Up', 'Move_Pct']].to_numpy(dtype=float))
+        for number, (key, g) in enumerate(panel.groupby(by, observed=True))
+    ]
+
+    if n_jobs == 1 or len(groups) < 2:
+        rows = _bootstrap_groups(groups, n_boot, alpha, seed)
+    else:
+        n_workers = min(n_jobs or os.cpu_count() or 1, len(groups))
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            batches = [groups[i::n_workers] for i in range(n_workers)]
+            rows = [row for batch in pool.map(_bootstrap_groups, batches, [n_boot] * n_workers,
+                                              [alpha] * n_workers, [seed] * n_workers)
+                    for row in batch]
+
+    cols = by + ['Up_Freq_Low', 'Up_Freq_High', 'Mean_Move_Low', 'Mean_Move_High']
+    return pd.DataFrame(rows, columns=cols).set_index(by)
+
+def benjamini_hochberg(p_values, q=0.05):
+    """Mask of the p-values that survive a Benjamini-Hochberg false discovery rate of ``q``."""
+    p = np.asarray(p_values, dtype=float)
+    order = np.argsort(p)  # NaNs sort last and never pass
+    n = np.count_nonzero(~np.isnan(p))
+    passed = p[order] <= q * np.arange(1, len(p) + 1) / max(n, 1)
+    k = passed.nonzero()[0].max() + 1 if passed.any() else 0
+    mask = np.zeros(len(p), dtype=bool)
+    mask[order[:k]] = True
+    return mask
+
+def _two_proportion_p(up, days, rest_up, rest_days):
+    # Two-sided pooled z-test of the group's up-rate against the rest of the symbol's days
+    pooled = (up + rest_up) / (days + rest_days)
+    se = np.sqrt(pooled * (1 - pooled) * (1 / days + 1 / rest_days))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = np.abs(up / days - rest_up / rest_days) / se
+    return np.array([math.erfc(v / math.sqrt(2)) if np.isfinite(v) else np.nan for v in z])
+
+def seasonality_report(panel, by=('Symbol', 'Weekday'), fdr=0.05, **bootstrap_kwargs):
+    """Seasonality table with bootstrap CIs and an Edge column.
+
+    Each group's up-rate is tested against the same symbol's other days, and
+    Edge is only set where the p-value survives Benjamini-Hochberg at ``fdr``
+    across every group in the report, so a big universe doesn't flag ~5% of
+    cells by chance.
+    """
+    report = seasonality_table(panel, by).join(bootstrap_ci(panel, by, **bootstrap_kwargs))
+
+    symbols = report.index.get_level_values('Symbol')
+    totals = panel.groupby('Symbol').agg(Days=('Up', 'size'), Ups=('Up', 'sum')).reindex(symbols)
+    days = report['Days'].to_numpy(dtype=float)
+    up = report['Up_Freq'].to_numpy() * days
+    rest_days = totals['Days'].to_numpy(dtype=float) - days
+    rest_up = totals['Ups'].to_numpy(dtype=float) - up
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        report['Rest_Up_Freq'] = rest_up / rest_days
+    report['P_Value'] = _two_proportion_p(up, days, rest_up, rest_days)
+    significant = benjamini_hochberg(report['P_Value'], fdr)
+    report['Edge'] = np.select(
+        [significant & (report['Up_Freq'] > report['Rest_Up_Freq']),
+         significant & (report['Up_Freq'] < report['Rest_Up_Freq'])],
+        ['Up', 'Down'],
+        default='',
+    )
+    return report
@@ -1,13 +1,17 @@
+import sys
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import ta
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
 import plotly.graph_objects as go
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.schema import SchemaError, apply_schema, validate_header
+from model import FEATURES, add_indicators, add_target, fit_model
+
 # --- Title ---
 st.title("📈 Advanced Stock Trend Predictor with Explanation")
 
@@ -15,25 +19,22 @@ st.title("📈 Advanced Stock Trend Predictor with Explanation")
 uploaded_file = st.file_uploader("Upload Stock CSV File", type=["csv"])
 
 if uploaded_file:
-    df = pd.read_csv(uploaded_file)
+    # --- Check required columns (header only) ---
+    try:
+        validate_header(uploaded_file, 'equity_pandit')
+    except SchemaError as e:
+        st.error(str(e))
+        st.stop()
 
-    # --- Check required columns ---
-    required = ['Date', 'Price', 'Open', 'High', 'Low']
-    for col in required:
-        if col not in df.columns:
-            st.error(f"Missing required column: {col}")
-            st.stop()
+    df = pd.read_csv(uploaded_file)
+    df = apply_schema(df, 'equity_pandit')  # Price -> Close
 
     # --- Preprocessing ---
     df['Date'] = pd.to_datetime(df['Date'])
     df.sort_values('Date', inplace=True)
     df.reset_index(drop=True, inplace=True)
 
-    df['Close'] = df['Price']  # standard column
-    df['SMA_14'] = ta.trend.sma_indicator(df['Close'], window=14)
-    df['RSI'] = ta.momentum.rsi(df['Close'], window=14)
-    macd = ta.trend.macd_diff(df['Close'])
-    df['MACD'] = macd
+    df = add_indicators(df)  # SMA_14, RSI, MACD
 
     # --- Candlestick pattern detection (simple) ---
     df['Candle_Body'] = df['Close'] - df['Open']
@@ -41,18 +42,12 @@ if uploaded_file:
                           np.where(df['Candle_Body'] < 0, 'Bearish', 'Neutral'))
 
     # --- Target: 1 if next day close is higher, else 0 ---
-    df['Target'] = df['Close'].shift(-1) > df['Close']
-    df['Target'] = df['Target'].astype(int)
+    df = add_target(df)
 
     # --- Features and Model ---
-    features = ['SMA_14', 'RSI', 'MACD']
+    features = FEATURES
     df.dropna(inplace=True)
-    X = df[features]
-    y = df['Target']
-    X_train, X_test, y_train, y_test = train_test_split(X, y, shuffle=False, test_size=0.2)
-
-    model = RandomForestClassifier(n_estimators=100, random_state=42)
-    model.fit(X_train, y_train)
+    model, X_test, y_test = fit_model(df)
     accuracy = model.score(X_test, y_test)
 
     # --- Prediction for Latest Row ---
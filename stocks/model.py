@@ -0,0 +1,114 @@
+import sys
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common import indicators
+
+FEATURES = ['SMA_14', 'RSI', 'MACD']
+
+def add_indicators(df):
+    # Same values as ta's sma_indicator / rsi / macd_diff (see common/indicators.py)
+    close = df['Close'].to_numpy(dtype=float)[None, :]
+    df['SMA_14'] = indicators.sma(close, window=14)[0]
+    df['RSI'] = indicators.rsi(close, window=14)[0]
+    df['MACD'] = indicators.macd_diff(close)[0]
+    return df
+
+def add_target(df):
+    # 1 if next day close is higher, else 0
+    df['Target'] = (df['Close'].shift(-1) > df['Close']).astype(int)
+    return df
+
+def fit_model(df):
+    """Fit on the first 80% of rows (no shuffling); returns (model, X_test, y_test)."""
+    X = df[FEATURES]
+    y = df['Target']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, shuffle=False, test_size=0.2)
+
+    model = RandomForestClassifier(n_estimators=100, random_state=42)
+    model.fit(X_train, y_train)
+    return model, X_test, y_test
+
+class IndicatorState:
+    """Running SMA/RSI/MACD for one symbol, updated one close at a time.
+
+    Follows the same recursions as add_indicators, so replaying a history and
+    then appending bars gives the features the app would compute from scratch.
+    Bars are keyed on date: a bar for the latest date replaces it (an intraday
+    revision or a resend), one for an earlier date is rejected.
+    """
+
+    def __init__(self, window=14, fast=12, slow=26, sign=9):
+        self.window = window
+        self._closes = deque(maxlen=window)
+        self._last_close = None
+        self._rsi_alpha = 1 / window
+        self._alphas = (2 / (fast + 1), 2 / (slow + 1), 2 / (sign + 1))
+        self._periods = (fast, slow, sign)
+        self._up = self._down = None
+        self._ema = [None, None, None]  # fast, slow, signal
+        self._count = [0, 0, 0]
+        self.bars = 0
+        self.features = None
+        self.last_date = None
+        self._before_last = None
+
+    def _snapshot(self):
+        return (list(self._closes), self._last_close, self._up, self._down,
+                list(self._ema), list(self._count), self.bars, self.features)
+
+    def _restore(self, snapshot):
+        closes, self._last_close, self._up, self._down, ema, count, self.bars, self.features = snapshot
+        self._closes = deque(closes, maxlen=self.window)
+        self._ema, self._count = list(ema), list(count)
+
+    def _ema_step(self, i, x):
+        a = self._alphas[i]
+        self._ema[i] = x if self._ema[i] is None else a * x + (1 - a) * self._ema[i]
+        self._count[i] += 1
+        return self._ema[i] if self._count[i] >= self._periods[i] else None
+
+    def update(self, close, date=None):
+        close = float(close)
+        if date is not None and self.last_date is not None:
+            if date < self.last_date:
+                raise ValueError(f"bar for {date} is older than the latest bar ({self.last_date})")
+            if date == self.last_date:
+                self._restore(self._before_last)
+        self._before_last = self._snapshot()
+        if date is not None:
+            self.last_date = date
+        return self._step(close)
+
+    def _step(self, close):
+        diff = 0.0 if self._last_close is None else close - self._last_close
+        self._last_close = close
+        self._closes.append(close)
+        self.bars += 1
+
+        a = self._rsi_alpha
+        up, down = max(diff, 0.0), max(-diff, 0.0)
+        self._up = up if self._up is None else a * up + (1 - a) * self._up
+        self._down = down if self._down is None else a * down + (1 - a) * self._down
+
+        fast = self._ema_step(0, close)
+        slow = self._ema_step(1, close)
+        macd_diff = None
+        if fast is not None and slow is not None:
+            line = fast - slow
+            signal = self._ema_step(2, line)
+            if signal is not None:
+                macd_diff = line - signal
+
+        if self.bars < self.window or macd_diff is None:
+            self.features = None
+        else:
+            sma = sum(self._closes) / self.window
+            rsi = 100.0 if self._down == 0 else 100 - 100 / (1 + self._up / self._down)
+            self.features = np.array([sma, rsi, macd_diff])
+        return self.features
@@ -0,0 +1,293 @@
+"""Local prediction service: the stocks/app.py model, kept warm for many symbols.
+
+Every CSV in a folder (Equity Pandit format) gets its model fitted and its
+indicator state built once at startup. Clients then push latest bars and
+ask for predictions over plain HTTP/JSON:
+
+    POST /bar      {"symbol": "TCS", "date": "2025-01-30", "close": 3912.5}  or  {"bars": [...]}
+    POST /predict  {"symbols": ["TCS", "INFY", ...]}
+    GET  /metrics  p50/p99 latency (cached and model calls), throughput
+    GET  /health
+
+A bar for a symbol's latest date replaces that bar instead of adding one.
+Features only change on /bar, so each symbol's prediction is cached until
+its next bar, and concurrent requests for the same symbol share one call.
+
+Each symbol has its own forest (as in the app), so requests for different
+symbols can't be merged into one predict_proba call. Instead the symbols
+are sharded over --workers single-process executors: each worker fits and
+keeps its shard's models, and calls for symbols in different shards run in
+parallel. Only the indicator states live in the server process.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from common.schema import apply_schema, validate_header
+from model import FEATURES, IndicatorState, add_indicators, add_target, fit_model
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found'}
+
+def load_history(path):
+    validate_header(str(path), 'equity_pandit')
+    df = apply_schema(pd.read_csv(path, thousands=','), 'equity_pandit')
+    df = df[['Date', 'Open', 'High', 'Low', 'Close']]
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df.sort_values('Date').reset_index(drop=True)
+
+def warm_symbol(path):
+    # Fit exactly as the app does, and replay the closes into a live indicator state
+    df = load_history(path)
+    state = IndicatorState()
+    for date, close in zip(df['Date'], df['Close']):
+        state.update(close, date.normalize())
+    df = add_target(add_indicators(df)).dropna()
+    model, _, _ = fit_model(df)
+    return Path(path).stem, model, state
+
+# ---- Model workers -----
+# These run inside a shard's worker process; the models never leave it
+
+_worker_models = {}
+
+def warm_shard(paths):
+    # Fit this shard's models and keep them here; only the states go back
+    states = {}
+    for path in paths:
+        symbol, model, state = warm_symbol(path)
+        _worker_models[symbol] = model
+        states[symbol] = state
+    return states
+
+def predict_in_worker(symbol, features):
+    # A DataFrame with the training columns, as the model was fit on one
+    X = pd.DataFrame(features.reshape(1, -1), columns=FEATURES)
+    return _worker_models[symbol].predict_proba(X)[0]
+
+def start_shards(paths, n_workers):
+    """One single-process executor per shard; returns (shards, states, shard_of)."""
+    shards = [ProcessPoolExecutor(max_workers=1) for _ in range(max(1, min(n_workers, len(paths))))]
+    warming = [shard.submit(warm_shard, paths[i::len(shards)]) for i, shard in enumerate(shards)]
+    states, shard_of = {}, {}
+    for i, future in enumerate(warming):
+        for symbol, state in future.result().items():
+            states[symbol] = state
+            shard_of[symbol] = i
+    return shards, states, shard_of
+
+class PredictionService:
+    def __init__(self, states, shards, shard_of, window=10_000):
+        self.states = states
+        self.shards = shards
+        self.shard_of = shard_of
+        self._cache = {}  # symbol -> prediction for its current features
+        self._inflight = {}  # (symbol, version) -> task of a model call already running
+        self._versions = {}  # symbol -> number of bars received since startup
+        # seconds per prediction, kept apart so cache hits don't hide the model's cost
+        self._latencies = {'cached': deque(maxlen=window), 'model': deque(maxlen=window)}
+        self._completed = deque(maxlen=window)  # completion times
+        self._started = time.perf_counter()
+        self.counts = {'cached': 0, 'model': 0}
+
+    # ---- State and prediction -----
+
+    def update_bar(self, symbol, date, close):
+        if symbol not in self.states:
+            raise KeyError(symbol)
+        features = self.states[symbol].update(close, date)
+        self._versions[symbol] = self._versions.get(symbol, 0) + 1
+        self._cache.pop(symbol, None)
+        return None if features is None else features.tolist()
+
+    async def _run_model(self, symbol, version):
+        features = self.states[symbol].features
+        if features is None:
+            return {'symbol': symbol, 'error': 'not enough bars for indicators'}
+        shard = self.shards[self.shard_of[symbol]]
+        try:
+            proba = await asyncio.get_running_loop().run_in_executor(shard, predict_in_worker, symbol, features)
+        except Exception as e:
+            return {'symbol': symbol, 'error': str(e)}
+        pred = int(np.argmax(proba))
+        result = {
+            'symbol': symbol,
+            'prediction': pred,
+            'probability': float(proba[pred]),
+            'action': 'BUY' if pred == 1 else 'SELL / HOLD',
+            'features': features.tolist(),
+        }
+        # A bar that arrived during the call makes this result stale
+        if self._versions.get(symbol, 0) == version:
+            self._cache[symbol] = result
+        return result
+
+    async def predict(self, symbol):
+        if symbol not in self.states:
+            return {'symbol': symbol, 'error': 'unknown symbol'}
+        started = time.perf_counter()
+        if symbol in self._cache:
+            result, kind = self._cache[symbol], 'cached'
+        else:
+            key = (symbol, self._versions.get(symbol, 0))
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._run_model(*key))
+                self._inflight[key] = task
+                task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            result, kind = await task, 'model'
+
+        now = time.perf_counter()
+        self._latencies[kind].append(now - started)
+        self._completed.append(now)
+        self.counts[kind] += 1
+        return result
+
+    @staticmethod
+    def _percentiles(seconds):
+        ms = np.array(seconds) * 1000
+        if not len(ms):
+            return {'p50_ms': None, 'p99_ms': None}
+        return {'p50_ms': float(np.percentile(ms, 50)), 'p99_ms': float(np.percentile(ms, 99))}
+
+    def metrics(self):
+        now = time.perf_counter()
+        span = min(60.0, now - self._started)
+        recent = sum(1 for t in self._completed if now - t <= 60.0)
+        return {
+            'symbols': len(self.states),
+            'workers': len(self.shards),
+            'predictions': sum(self.counts.values()),
+            **self._percentiles([*self._latencies['cached'], *self._latencies['model']]),
+            'cached': {'count': self.counts['cached'], **self._percentiles(self._latencies['cached'])},
+            'model': {'count': self.counts['model'], **self._percentiles(self._latencies['model'])},
+            'throughput_per_s': recent / span if span > 0 else None,
+        }
+
+    # ---- HTTP -----
+
+    @staticmethod
+    def parse_bar(bar):
+        """(symbol, date, close) from a /bar entry; ValueError on anything malformed."""
+        if not isinstance(bar, dict):
+            raise ValueError('each bar must be an object')
+        symbol, date, close = bar.get('symbol'), bar.get('date'), bar.get('close')
+        if not isinstance(symbol, str):
+            raise ValueError('bar needs a "symbol" string')
+        if not isinstance(close, (int, float)) or isinstance(close, bool) or not math.isfinite(close):
+            raise ValueError(f'bar for {symbol} needs a finite numeric "close"')
+        if not isinstance(date, str):
+            raise ValueError(f'bar for {symbol} needs a "date" (YYYY-MM-DD)')
+        return symbol, pd.Timestamp(date).normalize(), float(close)
+
+    async def route(self, method, path, body):
+        payload = json.loads(body) if body else {}
+        if not isinstance(payload, dict):
+            raise ValueError('body must be a JSON object')
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', 'symbols': len(self.states)}
+        if method == 'GET' and path == '/metrics':
+            return 200, self.metrics()
+        if method == 'POST' and path == '/bar':
+            bars = payload.get('bars', [payload])
+            if not isinstance(bars, list):
+                raise ValueError('"bars" must be a list')
+            # Validate everything first so a bad entry doesn't leave half the bars applied
+            parsed = [self.parse_bar(bar) for bar in bars]
+            updated = []
+            for symbol, date, close in parsed:
+                try:
+                    updated.append({'symbol': symbol, 'features': self.update_bar(symbol, date, close)})
+                except KeyError:
+                    updated.append({'symbol': symbol, 'error': 'unknown symbol'})
+                except ValueError as e:
+                    updated.append({'symbol': symbol, 'error': str(e)})
+            return 200, {'updated': updated}
+        if method == 'POST' and path == '/predict':
+            symbols = payload.get('symbols') or [payload['symbol']]
+            if not isinstance(symbols, list) or not all(isinstance(s, str) for s in symbols):
+                raise ValueError('"symbols" must be a list of strings')
+            return 200, {'predictions': await asyncio.gather(*(self.predict(s) for s in symbols))}
+        return 404, {'error': f'no route for {method} {path}'}
+
+    async def handle_client(self, reader, writer):
+        # Minimal HTTP/1.1 with keep-alive, enough for dashboards and scripts
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                    length = int(headers.get('content-length', 0))
+                    if length < 0:
+                        raise ValueError('negative Content-Length')
+                except ValueError as e:
+                    # The body can't be delimited, so answer and drop the connection
+                    headers['connection'] = 'close'
+                    status, payload = 400, {'error': f'bad request: {e}'}
+                else:
+                    body = await reader.readexactly(length)
+                    try:
+                        status, payload = await self.route(method, target.split('?')[0], body)
+                    except (ValueError, KeyError, TypeError) as e:
+                        status, payload = 400, {'error': f'bad request: {e}'}
+
+                data = json.dumps(payload).encode('utf-8')
+                writer.write(b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n\r\n'
+                             % (status, REASONS[status].encode(), len(data)) + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(service, host, port):
+    server = await asyncio.start_server(service.handle_client, host, port)
+    print(f'Serving {len(service.states)} symbols on http://{host}:{port}')
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm-model prediction service for Equity Pandit CSVs")
+    parser.add_argument('data_dir', help="Folder of <SYMBOL>.csv files")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Model worker processes; symbols are sharded across them")
+    args = parser.parse_args()
+
+    paths = sorted(Path(args.data_dir).glob('*.csv'))
+    start = time.perf_counter()
+    shards, states, shard_of = start_shards(paths, args.workers)
+    print(f'Warmed {len(states)} models on {len(shards)} workers in {time.perf_counter() - start:.1f}s')
+
+    service = PredictionService(states, shards, shard_of)
+    try:
+        asyncio.run(serve(service, args.host, args.port))
+    finally:
+        for shard in shards:
+            shard.shutdown(cancel_futures=True)
+
+if __name__ == '__main__':
+    main()